@@ -1,73 +1,99 @@
 #!/usr/bin/env python3
 """Build script to generate version file from git tags and SHA."""
 
+import functools
+import os
+import re
+import shutil
 import subprocess
 from pathlib import Path
 
+# Resolve git once so each call execs it directly instead of searching PATH again
+_GIT = shutil.which("git") or "git"
 
-def run_git_command(args):
-    """Run a git command and return output."""
+# The project's `version = "..."` line in pyproject.toml
+_VERSION_RE = re.compile(rb'(?m)^version = "[^"]*"')
+
+
+@functools.cache
+def run_git_command(args: tuple[str, ...]):
+    """Run a git command and return output.
+
+    Memoized per args tuple: git state does not change during a build, so a
+    repeated query costs no extra subprocess.
+    """
     try:
         result = subprocess.run(
-            ["git"] + args,
-            capture_output=True,
-            text=True,
+            [_GIT, *args],
+            # git never needs input here; don't let it inherit (and wait on) a terminal
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            # Failures are reported through the return code; nothing reads git's stderr
+            stderr=subprocess.DEVNULL,
             check=True,
             timeout=1,
         )
-        return result.stdout.strip()
+        # describe/rev-parse output is ASCII; skip locale-dependent text decoding
+        return result.stdout.strip().decode("ascii", errors="replace")
     except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired):
         return None
 
 
-def get_git_sha():
-    """Get current git SHA."""
-    sha = run_git_command(["rev-parse", "--short", "HEAD"])
-    return sha if sha else "unknown"
+def describe_head():
+    """Describe HEAD relative to the most recent tag in a single git invocation.
+
+    `git describe --tags --long --dirty --always` yields everything the version
+    needs in one process: "<tag>-<distance>-g<sha>[-dirty]", or just
+    "<sha>[-dirty]" when no tags exist. Distance 0 means HEAD is the tagged
+    commit. `--dirty` compares the index and working tree against HEAD, so
+    untracked files do not count as changes.
 
+    Returns (tag, distance, sha, dirty); tag and distance are None without tags.
+    Returns None when git is unavailable or this is not a repository.
+    """
+    described = run_git_command(("describe", "--tags", "--long", "--dirty", "--always"))
+    if not described:
+        return None
 
-def is_working_tree_dirty():
-    """Check if working tree has uncommitted changes."""
-    result = run_git_command(["status", "--porcelain"])
-    return bool(result)
+    match = re.match(r"^(?:(.+)-(\d+)-g)?([0-9a-f]+)(-dirty)?$", described)
+    if not match:
+        return None
+    tag, distance, sha, dirty = match.groups()
+    return tag, int(distance) if distance else None, sha, bool(dirty)
 
 
 def get_version_from_git():
-    """Get version from git tags.
+    """Get version and short SHA from git tags.
 
-    Returns version in format:
+    Returns (version, sha), with sha "unknown" outside a git checkout, and
+    version in format:
     - "X.Y.Z" if on a tag
     - "X.Y.Z+sha" if commits after tag
     - "X.Y.Z+sha.dirty" if uncommitted changes
     - "0.0.0+sha" if no tags exist
     """
-    # Get the most recent tag
-    tag = run_git_command(["describe", "--tags", "--abbrev=0"])
+    described = describe_head()
+    if not described:
+        return "0.0.0+unknown", "unknown"
+
+    tag, distance, sha, dirty = described
 
     if not tag:
         # No tags exist yet, use 0.0.0
-        version = "0.0.0"
-        sha = get_git_sha()
-        return f"{version}+{sha}"
+        return f"0.0.0+{sha}", sha
 
     # Strip 'v' prefix if present (v0.1.0 -> 0.1.0)
     version = tag[1:] if tag.startswith("v") else tag
 
-    # Check if we're exactly on the tag
-    current_sha = run_git_command(["rev-parse", "HEAD"])
-    tag_sha = run_git_command(["rev-parse", f"{tag}^{{}}"])
-
-    sha = get_git_sha()
-
-    if current_sha != tag_sha:
+    if distance:
         # Commits after tag
         version = f"{version}+{sha}"
 
-    if is_working_tree_dirty():
+    if dirty:
         # Uncommitted changes
         version = f"{version}.dirty" if "+" in version else f"{version}+{sha}.dirty"
 
-    return version
+    return version, sha
 
 
 def update_pyproject_version(version: str) -> None:
@@ -76,32 +102,48 @@ def update_pyproject_version(version: str) -> None:
     if not pyproject_path.exists():
         return
 
-    content = pyproject_path.read_text()
-    lines = content.splitlines()
+    # Work on raw bytes so the file's line endings are preserved as-is
+    content = pyproject_path.read_bytes()
 
-    # Find and replace version line
-    for i, line in enumerate(lines):
-        if line.startswith("version = "):
-            # Extract base version (without +sha suffix) for pyproject.toml
-            base_version = version.split("+")[0].split(".dirty")[0]
-            lines[i] = f'version = "{base_version}"'
-            break
+    # Extract base version (without +sha suffix) for pyproject.toml
+    base_version = version.split("+")[0].split(".dirty")[0]
+    updated = _VERSION_RE.sub(f'version = "{base_version}"'.encode(), content, count=1)
 
-    pyproject_path.write_text("\n".join(lines) + "\n")
+    # Leave the file (and its mtime) alone when the version is already current
+    if updated != content:
+        pyproject_path.write_bytes(updated)
 
 
 def generate_version_file():
-    """Generate _version.py with version from git and current SHA."""
-    version = get_version_from_git()
-    git_sha = get_git_sha()
+    """Generate _version.py with version from git and current SHA.
+
+    Set GSTAT_SKIP_GIT=1 to keep an existing _version.py without running git
+    (e.g. when building from an sdist that already ships one). Without an
+    existing file the version is still resolved from git.
+    """
+    version_file = Path("src/gstat/_version.py")
+    if os.environ.get("GSTAT_SKIP_GIT") == "1" and version_file.exists():
+        print(f"GSTAT_SKIP_GIT set, keeping existing {version_file}")
+        return
+
+    version, git_sha = get_version_from_git()
 
     # Update pyproject.toml with base version
     update_pyproject_version(version)
 
-    version_file = Path("src/gstat/_version.py")
-    version_file.write_text(
+    content = (
         f'# Auto-generated during build\n__version__ = "{version}"\n__git_sha__ = "{git_sha}"\n'
-    )
+    ).encode()
+    if version_file.exists() and version_file.read_bytes() == content:
+        # Unchanged git state: skip the rewrite so downstream mtimes stay valid
+        print(f"{version_file} is up to date with version={version}, git={git_sha}")
+        return
+
+    # Write a per-process temp file next to the target and swap it in, so readers and
+    # concurrent builds only ever see a complete _version.py
+    tmp_file = version_file.with_name(f"{version_file.name}.{os.getpid()}.tmp")
+    tmp_file.write_bytes(content)
+    os.replace(tmp_file, version_file)
     print(f"Generated {version_file} with version={version}, git={git_sha}")
 
 
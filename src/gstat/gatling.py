@@ -6,7 +6,7 @@ from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import NamedTuple
+from typing import NamedTuple, TextIO
 
 import numpy as np
 import pandas as pd
@@ -34,9 +34,12 @@ def request_matches(
     return True
 
 
-def parse_simulation_csv(csv_path: Path) -> pd.DataFrame:
+def parse_simulation_csv(csv_path: Path | TextIO) -> pd.DataFrame:
     """Parse simulation.csv and return all request records (OK and KO).
 
+    `csv_path` may also be an open text buffer (e.g. io.StringIO), which lets
+    tests feed CSV content without writing it to disk.
+
     Percentiles are computed over the full population on purpose: when KOs are
     present the percentile shifts regardless of which subset you'd pick (OK-only
     biases toward survivors, KO-only is a failure-mode artifact). Surfacing the
@@ -427,6 +430,26 @@ def _load_single_directory(
     full path before the per-request stats are computed (skips percentile work
     for filtered-out requests). See `request_matches` for filter semantics.
     """
+    simulation_csv = directory / "simulation.csv"
+    if not simulation_csv.exists():
+        raise FileNotFoundError(f"simulation.csv not found in {directory}")
+
+    df = parse_simulation_csv(simulation_csv)
+    return _load_from_frame(df, directory, include_request, exclude_request)
+
+
+def _load_from_frame(
+    df: pd.DataFrame,
+    directory: Path,
+    include_request: list[re.Pattern[str]] | None = None,
+    exclude_request: list[re.Pattern[str]] | None = None,
+) -> tuple[str, str, GatlingRun]:
+    """Build a GatlingRun from request records already parsed by parse_simulation_csv.
+
+    `directory` supplies the simulation name, run timestamp, and suffix via its
+    basename; it is not read from. Split out of _load_single_directory so the
+    per-request stats can be computed from an in-memory frame.
+    """
     parsed = parse_gating_directory_name(directory.name)
     if parsed:
         simulation, run_timestamp, suffix = parsed
@@ -434,11 +457,6 @@ def _load_single_directory(
         simulation = "unknown"
         run_timestamp = "unknown"
         suffix = ""
-    simulation_csv = directory / "simulation.csv"
-    if not simulation_csv.exists():
-        raise FileNotFoundError(f"simulation.csv not found in {directory}")
-
-    df = parse_simulation_csv(simulation_csv)
 
     # Iterate in Gatling HTML report order. See order_requests_gatling_html.
     df["group_hierarchy"] = df["group_hierarchy"].fillna("")
@@ -12,6 +12,7 @@ from contextlib import redirect_stderr
 from datetime import datetime
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 from gstat import (
@@ -23,9 +24,10 @@ from gstat import (
     load_gatling_data,
     order_requests_gatling_html,
     parse_gatling_directory_timestamp,
+    parse_simulation_csv,
     plot_percentiles_stacked,
 )
-from gstat.gatling import request_matches
+from gstat.gatling import _load_from_frame, request_matches
 
 FIXTURES_ROOT = Path(__file__).parent / "fixtures"
 FLAT_MULTI = FIXTURES_ROOT / "flat-multi"
@@ -52,45 +54,38 @@ class TestTraceMapping(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         cls.gatling_data = load_gatling_data(FIXTURE_DIR)
+        # The tests only read the figure's updatemenus, so one figure serves them all
+        cls.fig = plot_percentiles_stacked(cls.gatling_data)
+
+        # Summarize each request button's visible traces in one pass:
+        # (request_name, first visible index, last visible index, visible count).
+        # The request dropdown is the second menu (index 1).
+        cls.per_button = []
+        for button in cls.fig.layout.updatemenus[1].buttons:
+            indices = np.flatnonzero(np.asarray(button.args[0]["visible"], dtype=bool))
+            if indices.size:
+                min_i, max_i = int(indices[0]), int(indices[-1])
+            else:
+                min_i, max_i = None, None
+            cls.per_button.append((button.label, min_i, max_i, int(indices.size)))
 
     def test_trace_indices_are_non_overlapping(self):
         """Verify that trace index ranges for different requests don't overlap."""
-        fig = plot_percentiles_stacked(self.gatling_data)
-
-        # Extract trace mapping from the figure's updatemenus
-        # The request dropdown is the second menu (index 1)
-        request_dropdown = fig.layout.updatemenus[1]
-
-        # Collect all trace indices that are set to True for each request
-        trace_sets = []
-        for button in request_dropdown.buttons:
-            request_name = button.label
-            visibility = button.args[0]["visible"]
-            visible_indices = {i for i, v in enumerate(visibility) if v}
-            trace_sets.append((request_name, visible_indices))
-
-        # Verify no overlaps between any two requests
-        for i, (name1, traces1) in enumerate(trace_sets):
-            for name2, traces2 in trace_sets[i + 1 :]:
-                overlap = traces1 & traces2
-                self.assertEqual(
-                    len(overlap),
-                    0,
-                    f"Trace indices overlap between '{name1}' and '{name2}': {overlap}",
-                )
+        ranges = sorted(
+            (min_i, max_i, name) for name, min_i, max_i, _ in self.per_button if min_i is not None
+        )
+
+        # Sorted by start, two ranges overlap only if a range starts before its predecessor ends
+        for (_, prev_max, prev_name), (start, _, name) in zip(ranges, ranges[1:], strict=False):
+            self.assertGreater(
+                start,
+                prev_max,
+                f"Trace indices overlap between '{prev_name}' and '{name}'",
+            )
 
     def test_each_request_has_correct_number_of_traces(self):
         """Verify each request has exactly 6 traces (5 bars + 1 mean line)."""
-        fig = plot_percentiles_stacked(self.gatling_data)
-
-        # The request dropdown is the second menu (index 1)
-        request_dropdown = fig.layout.updatemenus[1]
-
-        for button in request_dropdown.buttons:
-            request_name = button.label
-            visibility = button.args[0]["visible"]
-            visible_count = sum(visibility)
-
+        for request_name, _, _, visible_count in self.per_button:
             # Each request should have 5 bar traces + 1 mean line = 6 traces
             self.assertEqual(
                 visible_count,
@@ -100,23 +95,14 @@ class TestTraceMapping(unittest.TestCase):
 
     def test_trace_indices_are_contiguous(self):
         """Verify that trace indices for each request are contiguous."""
-        fig = plot_percentiles_stacked(self.gatling_data)
-
-        # The request dropdown is the second menu (index 1)
-        request_dropdown = fig.layout.updatemenus[1]
-
-        for button in request_dropdown.buttons:
-            request_name = button.label
-            visibility = button.args[0]["visible"]
-            visible_indices = [i for i, v in enumerate(visibility) if v]
-
-            # Check that indices are contiguous
-            if len(visible_indices) > 0:
-                expected_range = list(range(min(visible_indices), max(visible_indices) + 1))
+        for request_name, min_i, max_i, count in self.per_button:
+            # Contiguous means every index between the first and last visible one is visible
+            if count > 0:
                 self.assertEqual(
-                    visible_indices,
-                    expected_range,
-                    f"Trace indices for '{request_name}' are not contiguous: {visible_indices}",
+                    count,
+                    max_i - min_i + 1,
+                    f"Trace indices for '{request_name}' are not contiguous: "
+                    f"{count} visible in range {min_i}..{max_i}",
                 )
 
 
@@ -153,73 +139,66 @@ user,Single Events,,,,1762133613933,,,,end,,,
 """
         # fmt: on
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            test_dir = Path(tmpdir) / "trackertest-20250101010101010-test"
-            test_dir.mkdir()
-            (test_dir / "simulation.csv").write_text(csv_content)
+        # Parse the CSV from memory and build the run directly; the directory name
+        # only supplies the simulation/timestamp and is never touched on disk.
+        df = parse_simulation_csv(io.StringIO(csv_content))
+        _, _, run = _load_from_frame(df, Path("trackertest-20250101010101010-test"))
+        actual_requests = list(run.requests)
+
+        # Map of full_request_path -> (count, response_times, mean)
+        expected_requests = {
+            # Request without group hierarchy (NaN) - tests dropna=False
+            "Login": (1, [108], 108.0),
+            # Requests with single-level hierarchy
+            "Get a list of single events / Go to first page of program VBqh0ynB2wv": (
+                1,
+                [59],
+                59.0,
+            ),
+            "Get a list of TEs / Get first page of TEs of program ur1Edk5Oe2n": (
+                1,
+                [134],
+                134.0,
+            ),
+            "Get a list of TEs / Go to single enrollment / Get first enrollment": (1, [7], 7.0),
+            # Requests with nested hierarchy - same request_name, different contexts
+            "Get a list of single events / Get one single event / Get first event": (
+                2,
+                [23, 14],
+                18.5,
+            ),
+            "Get a list of single events / Get one single event / Get relationships for first event": (
+                2,
+                [5, 4],
+                4.5,
+            ),
+            "Get a list of TEs / Go to single enrollment / Get one event / Get first event from enrollment": (
+                2,
+                [13, 13],
+                13.0,
+            ),
+            "Get a list of TEs / Go to single enrollment / Get one event / Get relationships for first event": (
+                2,
+                [3, 4],
+                3.5,
+            ),
+        }
 
-            gatling_data = load_gatling_data(Path(tmpdir))
-
-            simulation = gatling_data.get_simulations()[0]
-            run = gatling_data.get_run_timestamps(simulation)[0]
-            actual_requests = gatling_data.get_requests(simulation, run)
-
-            # Map of full_request_path -> (count, response_times, mean)
-            expected_requests = {
-                # Request without group hierarchy (NaN) - tests dropna=False
-                "Login": (1, [108], 108.0),
-                # Requests with single-level hierarchy
-                "Get a list of single events / Go to first page of program VBqh0ynB2wv": (
-                    1,
-                    [59],
-                    59.0,
-                ),
-                "Get a list of TEs / Get first page of TEs of program ur1Edk5Oe2n": (
-                    1,
-                    [134],
-                    134.0,
-                ),
-                "Get a list of TEs / Go to single enrollment / Get first enrollment": (1, [7], 7.0),
-                # Requests with nested hierarchy - same request_name, different contexts
-                "Get a list of single events / Get one single event / Get first event": (
-                    2,
-                    [23, 14],
-                    18.5,
-                ),
-                "Get a list of single events / Get one single event / Get relationships for first event": (
-                    2,
-                    [5, 4],
-                    4.5,
-                ),
-                "Get a list of TEs / Go to single enrollment / Get one event / Get first event from enrollment": (
-                    2,
-                    [13, 13],
-                    13.0,
-                ),
-                "Get a list of TEs / Go to single enrollment / Get one event / Get relationships for first event": (
-                    2,
-                    [3, 4],
-                    3.5,
-                ),
-            }
-
-            # Verify exact set of requests (no missing, no extra)
-            self.assertEqual(set(actual_requests), set(expected_requests.keys()))
-
-            # Verify statistics for each request
-            for full_path, (
-                expected_count,
-                expected_times,
-                expected_mean,
-            ) in expected_requests.items():
-                data = gatling_data.get_request(simulation, run, full_path)
-                self.assertEqual(data.count, expected_count, f"Wrong count for {full_path}")
-                self.assertEqual(
-                    data.response_times, expected_times, f"Wrong times for {full_path}"
-                )
-                self.assertAlmostEqual(
-                    data.mean, expected_mean, places=2, msg=f"Wrong mean for {full_path}"
-                )
+        # Verify exact set of requests (no missing, no extra)
+        self.assertEqual(set(actual_requests), set(expected_requests.keys()))
+
+        # Verify statistics for each request
+        for full_path, (
+            expected_count,
+            expected_times,
+            expected_mean,
+        ) in expected_requests.items():
+            data = run.requests[full_path]
+            self.assertEqual(data.count, expected_count, f"Wrong count for {full_path}")
+            self.assertEqual(data.response_times, expected_times, f"Wrong times for {full_path}")
+            self.assertAlmostEqual(
+                data.mean, expected_mean, places=2, msg=f"Wrong mean for {full_path}"
+            )
 
 
 class TestRequestMatches(unittest.TestCase):